@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""ASGI entry point for the dashboard.
+
+Puts uvicorn's C HTTP parser and event loop in front of the Flask app:
+
+    uvicorn asgi:asgi_app --workers 4 --http httptools --loop uvloop --port 5001
+
+Each uvicorn worker imports this module, so the per-process background
+threads start here; the weekly scheduler is deliberately not started to
+avoid duplicate sends across workers (run it in one designated process,
+e.g. via gunicorn.conf.py or the dev entry point).
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from web_interface_dynamic import app, start_background
+
+start_background()
+asgi_app = WsgiToAsgi(app)
@@ -0,0 +1,48 @@
+"""Gunicorn config for the newsletter dashboard.
+
+Run with: gunicorn -c gunicorn.conf.py web_interface_dynamic:app
+"""
+
+import fcntl
+import multiprocessing
+import os
+import tempfile
+
+bind = "0.0.0.0:5001"
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_class = "gthread"
+threads = 8
+
+# Load the app (generator, source metrics, compiled regexes, warmed
+# templates) once in the master; workers share it copy-on-write instead of
+# each allocating its own copy.
+preload_app = True
+
+
+# Held open for the worker's lifetime by whichever worker wins the
+# scheduler lock; flock releases automatically when that process exits.
+_scheduler_lock = None
+
+
+def post_fork(server, worker):
+    # Threads don't survive the fork, so each worker starts its own writer
+    # and refresh threads; exactly one worker runs the weekly scheduler to
+    # avoid duplicate sends. An OS file lock picks that worker: unlike a
+    # worker.age check, the lock is released when its holder exits, so the
+    # replacement gunicorn forks after a recycle (timeout, HUP,
+    # max_requests) re-acquires it and sends keep going.
+    import web_interface_dynamic as wid
+
+    # Drop any keep-alive sockets the session may have pooled pre-fork;
+    # fresh connections open on first use in this worker.
+    wid.generator.source_manager.session.close()
+    wid.start_background()
+    global _scheduler_lock
+    lock = open(os.path.join(tempfile.gettempdir(), "newsletter-scheduler.lock"), "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return
+    _scheduler_lock = lock
+    wid.scheduler.start()
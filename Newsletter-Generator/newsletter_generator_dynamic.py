@@ -0,0 +1,924 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Enhanced AI newsletter generator with dynamic source management.
+
+Maintains a self-optimizing pool of RSS sources, scores each article for
+CS/AI/software relevance with OpenAI, and emails the resulting markdown
+newsletter to subscribers.
+"""
+
+import functools
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import re
+import smtplib
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit
+
+import feedparser
+import numpy as np
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dateutil import parser as date_parser
+from dateutil.tz import gettz
+from openai import OpenAI
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Reference text the embedding scorer compares articles against.
+_EMBED_REFERENCE = (
+    "artificial intelligence machine learning software engineering "
+    "computer science deep learning programming"
+)
+
+# feedparser's own date handling is the slow part of its dict build; parse
+# published stamps ourselves with dateutil and a fixed tz table instead.
+TZMAP = {
+    "EST": gettz("US/Eastern"), "EDT": gettz("US/Eastern"),
+    "CST": gettz("US/Central"), "CDT": gettz("US/Central"),
+    "MST": gettz("US/Mountain"), "MDT": gettz("US/Mountain"),
+    "PST": gettz("US/Pacific"), "PDT": gettz("US/Pacific"),
+    "GMT": gettz("GMT"), "UTC": gettz("UTC"),
+}
+EPOCH = datetime(1970, 1, 1)
+
+
+def _element_text(element, *names) -> str:
+    """First child text matching any local tag name, namespace-agnostic."""
+    for child in element:
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag in names:
+            text = (child.text or "").strip()
+            if not text and tag == "link":
+                return child.get("href", "")  # Atom <link href=...>
+            return text
+    return ""
+
+
+def parse_first_n(url: str, n: int = 10, etag: str = None, modified: str = None,
+                  session=None):
+    """Stream a feed and stop parsing after the first n items.
+
+    feedparser parses the whole body even though we only ever use the first
+    ten entries; iterparse with an early break makes the parse O(n_wanted)
+    instead of O(n_total). Returns (entries, etag, modified); entries is
+    None when the server answers 304.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    response = (session or requests).get(url, headers=headers, stream=True, timeout=10)
+    try:
+        if response.status_code == 304:
+            return None, etag, modified
+        response.raise_for_status()
+        response.raw.decode_content = True
+        entries = []
+        for _, element in ET.iterparse(response.raw, events=("end",)):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag not in ("item", "entry"):
+                continue
+            entries.append({
+                "title": _element_text(element, "title"),
+                "link": _element_text(element, "link"),
+                "summary": _element_text(element, "description", "summary"),
+                "published": _element_text(element, "pubDate", "published", "updated"),
+            })
+            element.clear()
+            if len(entries) >= n:
+                break
+        return (
+            entries,
+            response.headers.get("ETag", etag),
+            response.headers.get("Last-Modified", modified),
+        )
+    finally:
+        response.close()
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for deduplication across feeds.
+
+    Lowercases scheme/host, strips tracking (utm_*) query params, the
+    fragment, and any trailing slash, so cross-posted articles collapse to
+    one key.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = "&".join(
+        p for p in parts.query.split("&")
+        if p and not p.lower().startswith("utm_")
+    )
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, "")
+    )
+
+
+def parse_published(value: str) -> datetime:
+    """Parse an RSS date string to a naive-UTC datetime; EPOCH on failure."""
+    if not value:
+        return EPOCH
+    try:
+        dt = date_parser.parse(value, tzinfos=TZMAP, default=EPOCH)
+    except (ValueError, OverflowError):
+        return EPOCH
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+@dataclass(slots=True)
+class SourceMetrics:
+    """Rolling quality stats for a single RSS source."""
+    name: str
+    url: str
+    total_articles: int = 0
+    relevant_articles: int = 0
+    avg_relevance_score: float = 0.0
+    engagement_rate: float = 0.0
+    last_fetched: str = ""
+    active: bool = True
+    # HTTP validators for conditional GETs; servers answer 304 with an empty
+    # body when the feed is unchanged.
+    etag: str = None
+    modified: str = None
+    content_hash: str = None
+
+
+DEFAULT_SOURCES = {
+    "techcrunch": "https://techcrunch.com/feed/",
+    "hacker_news": "https://hnrss.org/frontpage",
+    "mit_tech_review": "https://www.technologyreview.com/feed/",
+    "ars_technica": "https://feeds.arstechnica.com/arstechnica/index",
+    "the_verge": "https://www.theverge.com/rss/index.xml",
+    "wired": "https://www.wired.com/feed/rss",
+    "venturebeat_ai": "https://venturebeat.com/category/ai/feed/",
+    "infoq": "https://feed.infoq.com/",
+}
+
+# Curated pool the optimizer can promote from when an active source under-performs.
+CANDIDATE_SOURCES = {
+    "techmeme": "https://www.techmeme.com/feed.xml",
+    "dev_to": "https://dev.to/feed",
+    "medium_ai": "https://medium.com/feed/tag/artificial-intelligence",
+    "medium_programming": "https://medium.com/feed/tag/programming",
+    "openai_blog": "https://openai.com/blog/rss.xml",
+    "google_ai_blog": "https://blog.research.google/feeds/posts/default",
+    "aws_news": "https://aws.amazon.com/blogs/aws/feed/",
+    "github_blog": "https://github.blog/feed/",
+    "stackoverflow_blog": "https://stackoverflow.blog/feed/",
+    "towards_data_science": "https://towardsdatascience.com/feed",
+    "the_register": "https://www.theregister.com/headlines.atom",
+    "zdnet": "https://www.zdnet.com/news/rss.xml",
+    "engadget": "https://www.engadget.com/rss.xml",
+    "slashdot": "https://rss.slashdot.org/Slashdot/slashdotMain",
+    "lobsters": "https://lobste.rs/rss",
+}
+
+
+# Source names end up in .feedcache filenames, so they must never carry
+# path separators or other filesystem metacharacters.
+_SOURCE_NAME_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class DynamicSourceManager:
+    """Maintains the RSS source pool and its performance metrics."""
+
+    def __init__(self, metrics_file="source_metrics.json", max_sources=50):
+        self.metrics_file = metrics_file
+        self.max_sources = max_sources
+        self.metrics: Dict[str, SourceMetrics] = {}
+        # One pooled session for every feed fetch; keep-alive amortizes the
+        # TCP+TLS handshake (~100-300ms each) across the whole source pool.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": "NewsletterBot/1.0",
+            # XML compresses 3-5x; on-wire bytes are the fetch bottleneck.
+            # The streaming parser decompresses in flight via decode_content.
+            "Accept-Encoding": "gzip, deflate",
+        })
+        # Per-host concurrency caps so fanning out a big validation or fetch
+        # batch never hammers a single server with the whole pool.
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.load_metrics()
+
+    def ensure_sources(self):
+        """Populate the default pool on first use, not at construction.
+
+        Constructing the manager must stay network-free: under gunicorn with
+        preload_app the module imports in the master, and any feed fetches
+        there would leave pooled keep-alive sockets to be forked into every
+        worker.
+        """
+        if not self.metrics:
+            self.initialize_default_sources()
+
+    def host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        # setdefault is atomic under the GIL, so no lock needed here.
+        return self._host_limits.setdefault(host, threading.BoundedSemaphore(8))
+
+    def _parse(self, url: str):
+        """Fetch a feed over the shared session and parse it fully."""
+        response = self.session.get(url, timeout=10)
+        return feedparser.parse(response.content)
+
+    def _validate(self, url: str):
+        """Probe a feed URL; returns the parsed feed, or None if unusable."""
+        try:
+            with self.host_semaphore(url):
+                feed = self._parse(url)
+        except Exception:
+            return None
+        return feed if feed.entries else None
+
+    def _commit(self, name: str, url: str, feed):
+        self.metrics[name] = SourceMetrics(
+            name=name,
+            url=url,
+            etag=getattr(feed, "etag", None),
+            modified=getattr(feed, "modified", None),
+        )
+
+    def add_source(self, name: str, url: str) -> bool:
+        """Validate a feed URL and add it to the pool."""
+        if not _SOURCE_NAME_RE.fullmatch(name):
+            print(f"Skipping {name!r}: source names may only contain "
+                  "letters, digits, underscores, and hyphens")
+            return False
+        if name in self.metrics or len(self.metrics) >= self.max_sources:
+            return False
+        feed = self._validate(url)
+        if feed is None:
+            print(f"Skipping {name}: feed returned no entries")
+            return False
+        self._commit(name, url, feed)
+        self.save_metrics()
+        return True
+
+    def _add_sources_parallel(self, sources: Dict[str, str], limit: int = None) -> List[str]:
+        """Validate candidate feeds concurrently, then commit on this thread.
+
+        Validation is a network probe per URL, so it fans out on a pool;
+        metrics-dict mutation and the save stay serialized here.
+        """
+        pending = {n: u for n, u in sources.items() if n not in self.metrics}
+        if not pending:
+            return []
+        added = []
+        with ThreadPoolExecutor(max_workers=min(32, len(pending))) as executor:
+            results = executor.map(
+                lambda kv: (kv[0], kv[1], self._validate(kv[1])), pending.items()
+            )
+            for name, url, feed in results:
+                if feed is None:
+                    continue
+                if limit is not None and len(added) >= limit:
+                    break
+                if len(self.metrics) >= self.max_sources:
+                    break
+                self._commit(name, url, feed)
+                added.append(name)
+        if added:
+            self.save_metrics()
+        return added
+
+    def remove_source(self, name: str) -> bool:
+        if name not in self.metrics:
+            return False
+        del self.metrics[name]
+        self.save_metrics()
+        return True
+
+    def initialize_default_sources(self):
+        print("Initializing default sources...")
+        self._add_sources_parallel(DEFAULT_SOURCES)
+
+    def discover_new_sources(self, limit: int = 3) -> List[str]:
+        """Promote candidate sources that are not yet in the pool."""
+        return self._add_sources_parallel(CANDIDATE_SOURCES, limit=limit)
+
+    def update_metrics(self, name: str, total: int, relevant: int, avg_score: float):
+        metrics = self.metrics.get(name)
+        if metrics is None:
+            return
+        metrics.total_articles += total
+        metrics.relevant_articles += relevant
+        # Exponential moving average keeps old runs from dominating.
+        if metrics.avg_relevance_score:
+            metrics.avg_relevance_score = 0.7 * metrics.avg_relevance_score + 0.3 * avg_score
+        else:
+            metrics.avg_relevance_score = avg_score
+        if metrics.total_articles:
+            metrics.engagement_rate = metrics.relevant_articles / metrics.total_articles
+        metrics.last_fetched = datetime.now().isoformat()
+        self.save_metrics()
+
+    def get_top_sources(self, limit: int = 15) -> Dict[str, str]:
+        """Best-performing active sources, name -> url."""
+        ranked = heapq.nlargest(
+            limit,
+            ((n, m) for n, m in self.metrics.items() if m.active),
+            key=lambda x: (x[1].engagement_rate, x[1].avg_relevance_score),
+        )
+        return {name: m.url for name, m in ranked}
+
+    def auto_optimize_sources(self):
+        """Deactivate consistently weak sources and try replacements."""
+        # Bound removals per cycle to what discovery can replace, and stop
+        # scanning as soon as the budget is spent.
+        budget = 3
+        sources_to_remove = []
+        for name, m in self.metrics.items():
+            if m.total_articles >= 20 and m.engagement_rate < 0.1:
+                sources_to_remove.append(name)
+                if len(sources_to_remove) >= budget:
+                    break
+        for name in sources_to_remove:
+            print(f"Deactivating under-performing source: {name}")
+            self.metrics[name].active = False
+        if sources_to_remove:
+            self.discover_new_sources(limit=len(sources_to_remove))
+        self.save_metrics()
+
+    def get_performance_report(self) -> Dict:
+        report = {
+            "total_sources": len(self.metrics),
+            "active_sources": sum(1 for m in self.metrics.values() if m.active),
+            "sources": {},
+        }
+        for name, m in self.metrics.items():
+            report["sources"][name] = {
+                "url": m.url,
+                "total_articles": m.total_articles,
+                "relevant_articles": m.relevant_articles,
+                "avg_relevance_score": round(m.avg_relevance_score, 3),
+                "engagement_rate": round(m.engagement_rate, 3),
+                "last_fetched": m.last_fetched,
+                "active": m.active,
+            }
+        return report
+
+    def save_metrics(self):
+        # orjson serializes dataclasses natively, so no per-field dict build.
+        with open(self.metrics_file, "wb") as f:
+            f.write(orjson.dumps(self.metrics, option=orjson.OPT_INDENT_2))
+
+    def load_metrics(self):
+        if not os.path.exists(self.metrics_file):
+            return
+        with open(self.metrics_file, "rb") as f:
+            data = orjson.loads(f.read())
+        for name, fields in data.items():
+            self.metrics[name] = SourceMetrics(**fields)
+
+
+# One compiled pattern covers headings, bold, emphasis, and links so the
+# newsletter body is converted in a single pass instead of a chain of
+# whole-string str.replace calls.
+_MD_RE = re.compile(
+    r"^(#{1,3}) (.+)$"
+    r"|\*\*(.+?)\*\*"
+    r"|\*(.+?)\*"
+    r"|\[([^\]]+)\]\(([^)]+)\)",
+    re.MULTILINE,
+)
+
+
+def _md_sub(match) -> str:
+    if match.group(1):
+        level = len(match.group(1))
+        return f"<h{level}>{match.group(2)}</h{level}>"
+    if match.group(3) is not None:
+        return f"<strong>{match.group(3)}</strong>"
+    if match.group(4) is not None:
+        return f"<em>{match.group(4)}</em>"
+    return f'<a href="{match.group(6)}">{match.group(5)}</a>'
+
+
+# Scores older than this are re-queried; articles rarely stay in feeds longer.
+RELEVANCE_CACHE_TTL = 30 * 86400
+
+FEED_CACHE_DIR = ".feedcache"
+
+
+class EnhancedNewsletterGeneratorWithDynamicSources:
+    """Generates and distributes the daily newsletter."""
+
+    def __init__(self):
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.source_manager = DynamicSourceManager()
+        self.tech_keywords = [
+            "artificial intelligence", "machine learning", "deep learning",
+            "neural network", "llm", "software engineering", "programming",
+            "python", "data science", "cloud computing", "cybersecurity",
+            "open source",
+        ]
+        # Keyword weights for the cheap lexical pre-score (built once; the
+        # scorer itself runs per article on the hot path).
+        self._kw_weight = {k.lower(): 1.5 for k in self.tech_keywords}
+        for phrase in list(self._kw_weight):
+            for word in phrase.split():
+                self._kw_weight.setdefault(word, 1.5)
+        # Single-pass multi-pattern matcher: one automaton scan replaces
+        # per-keyword substring tests (O(text) instead of O(keywords*text)).
+        self._ac = None
+        if ahocorasick is not None:
+            self._ac = ahocorasick.Automaton()
+            for keyword in self._kw_weight:
+                self._ac.add_word(keyword, keyword)
+            self._ac.make_automaton()
+        self.subscribers = [
+            e.strip() for e in os.getenv("NEWSLETTER_SUBSCRIBERS", "").split(",") if e.strip()
+        ]
+        # Static rubric text built once; per-call code only interpolates the
+        # article listing between the two halves.
+        self._prompt_prefix = (
+            "Rate the relevance of each article below to computer science,\n"
+            "artificial intelligence, and software engineering on a scale of "
+            "0.0 to 1.0.\nConsider technical depth, novelty, and practical "
+            "value for developers.\n\n"
+        )
+        self._prompt_suffix = (
+            '\n\nRespond with a JSON object {"scores": [...]} containing one '
+            "float per article, in order."
+        )
+        self._single_suffix = "\n\nReturn only the numerical score."
+        # Local embedding model for relevance scoring; loaded on first use so
+        # import stays cheap. Falls back to the LLM batch scorer when the
+        # sentence-transformers extra is not installed.
+        self._emb = None
+        self._emb_ref = None
+        # On-disk memo of LLM scores, keyed by content hash. Duplicate
+        # articles (cross-posted feeds, repeat daily runs) cost zero API calls.
+        # Backed by SQLite in WAL mode so the gunicorn workers can all read
+        # and write one file safely (dbm either holds an exclusive writer
+        # lock per process or has no locking at all); the connection opens
+        # lazily so a preloading master never forks an open handle.
+        self._cache_lock = threading.Lock()
+        self._relevance_cache = None
+        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.email_address = os.getenv("EMAIL_ADDRESS", "")
+        self.email_password = os.getenv("EMAIL_PASSWORD", "")
+
+    def analyze_article_relevance(self, article: Dict) -> float:
+        """Score one article 0.0-1.0 for CS/AI/software relevance via OpenAI."""
+        prompt = (
+            self._prompt_prefix
+            + f"Title: {article['title']}\nSummary: {article['summary'][:500]}"
+            + self._single_suffix
+        )
+        key = self._cache_key(article)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=10,
+                temperature=0,
+            )
+            score = float(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"Relevance scoring failed: {e}")
+            return 0.0
+        self._cache_put(key, score)
+        return score
+
+    def _embedder(self):
+        if self._emb is None and SentenceTransformer is not None:
+            self._emb = SentenceTransformer("all-MiniLM-L6-v2")
+            self._emb_ref = self._emb.encode(
+                [_EMBED_REFERENCE], normalize_embeddings=True
+            )
+        return self._emb
+
+    def score_articles_embed(self, articles: List[Dict]):
+        """Cosine relevance of each article against the CS/AI reference.
+
+        Embedding ~100 titles locally takes ~100ms versus a network
+        round-trip per LLM batch; the whole scoring phase moves from WAN
+        latency to local CPU.
+        """
+        vectors = self._emb.encode(
+            [a["title"] + " " + a["summary"][:200] for a in articles],
+            batch_size=32,
+            normalize_embeddings=True,
+        )
+        return (vectors @ self._emb_ref.T).ravel()
+
+    @staticmethod
+    def _cache_key(article: Dict) -> str:
+        return hashlib.sha1(
+            (article["title"] + article["summary"][:500]).encode()
+        ).hexdigest()
+
+    def _cache(self):
+        # Callers hold _cache_lock, which also serializes use of the single
+        # connection across this process's threads.
+        if self._relevance_cache is None:
+            conn = sqlite3.connect(".relevance_cache.db", check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS relevance (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    ts REAL NOT NULL
+                )"""
+            )
+            conn.commit()
+            self._relevance_cache = conn
+        return self._relevance_cache
+
+    def _cache_get(self, key: str):
+        with self._cache_lock:
+            row = self._cache().execute(
+                "SELECT value, ts FROM relevance WHERE key = ?", (key,)
+            ).fetchone()
+        if row is not None and time.time() - row[1] < RELEVANCE_CACHE_TTL:
+            return orjson.loads(row[0])
+        return None
+
+    def _cache_put(self, key: str, value):
+        with self._cache_lock:
+            conn = self._cache()
+            conn.execute(
+                "INSERT OR REPLACE INTO relevance (key, value, ts) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), time.time()),
+            )
+            conn.commit()
+
+    def _lexical_score(self, article: Dict) -> float:
+        """Deterministic keyword-overlap relevance score, no network.
+
+        Costs a few microseconds of set/dict lookups versus hundreds of
+        milliseconds for an OpenAI round-trip, so obvious non-tech noise
+        never reaches the LLM.
+        """
+        text = (article["title"] + " " + article["summary"]).lower()
+        if self._ac is not None:
+            words = text.split()
+            if not words:
+                return 0.0
+            hits = sum(self._kw_weight[kw] for _, kw in self._ac.iter(text))
+            return hits / len(words)
+        # Fallback when pyahocorasick is not installed.
+        tokens = re.findall(r"[a-z]+", text)
+        if not tokens:
+            return 0.0
+        tf = Counter(tokens)
+        hits = sum(self._kw_weight.get(k, 0.0) * c for k, c in tf.items())
+        return hits / len(tokens)
+
+    def analyze_articles_relevance_batch(self, articles: List[Dict]) -> List[float]:
+        """Score a batch of articles 0.0-1.0 in a single OpenAI call.
+
+        One numbered prompt per batch amortizes the network round-trip and
+        prompt-token overhead across ~20 articles instead of paying it per
+        article. Falls back to 0.0 per missing/unparseable index.
+        """
+        if not articles:
+            return []
+        scores = [0.0] * len(articles)
+        keys = [self._cache_key(a) for a in articles]
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(key)
+            if cached is not None:
+                scores[i] = cached
+            else:
+                misses.append(i)
+        for start in range(0, len(misses), 20):
+            batch_indices = misses[start:start + 20]
+            batch = [articles[i] for i in batch_indices]
+            listing = "\n".join(
+                f"{i + 1}. Title: {a['title']}\n   Summary: {a['summary'][:300]}"
+                for i, a in enumerate(batch)
+            )
+            prompt = self._prompt_prefix + listing + self._prompt_suffix
+            try:
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"},
+                    temperature=0,
+                )
+                raw = json.loads(response.choices[0].message.content)["scores"]
+            except Exception as e:
+                print(f"Batch relevance scoring failed: {e}")
+                continue
+            for j, i in enumerate(batch_indices):
+                try:
+                    scores[i] = float(raw[j])
+                except (IndexError, TypeError, ValueError):
+                    # Transient parse fallback: use 0.0 for this run but
+                    # leave it uncached so the article is re-scored next run.
+                    scores[i] = 0.0
+                    continue
+                self._cache_put(keys[i], scores[i])
+        return scores
+
+    @staticmethod
+    def _cache_entries(source_name: str, candidates: List[Dict]) -> str:
+        """Pickle parsed entries for reuse when the feed 304s next run."""
+        os.makedirs(FEED_CACHE_DIR, exist_ok=True)
+        blob = pickle.dumps(candidates)
+        content_hash = hashlib.md5(blob).hexdigest()
+        path = os.path.join(FEED_CACHE_DIR, f"{source_name}_{content_hash}.pkl")
+        with open(path, "wb") as f:
+            f.write(blob)
+        return content_hash
+
+    @staticmethod
+    def _load_cached_entries(source_name: str, content_hash: str) -> List[Dict]:
+        if not content_hash:
+            return []
+        path = os.path.join(FEED_CACHE_DIR, f"{source_name}_{content_hash}.pkl")
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return []
+
+    def _fetch_source(self, source_name: str, feed_url: str):
+        """Fetch and parse one feed. Runs on a worker thread; no scoring."""
+        metrics = self.source_manager.metrics.get(source_name)
+        with self.source_manager.host_semaphore(feed_url):
+            entries, etag, modified = parse_first_n(
+                feed_url,
+                n=10,
+                etag=metrics.etag if metrics else None,
+                modified=metrics.modified if metrics else None,
+                session=self.source_manager.session,
+            )
+        if entries is None:
+            # Feed unchanged: reuse the pickled entries from the last parse
+            # instead of re-running the XML parse (re-scoring them is free
+            # thanks to the relevance cache).
+            candidates = self._load_cached_entries(
+                source_name, metrics.content_hash if metrics else None
+            )
+        else:
+            if metrics is not None:
+                metrics.etag = etag
+                metrics.modified = modified
+            candidates = [
+                dict(
+                    entry,
+                    published_dt=parse_published(entry["published"]),
+                    source=source_name,
+                )
+                for entry in entries
+            ]
+            if metrics is not None and candidates:
+                new_hash = self._cache_entries(source_name, candidates)
+                # Drop the superseded pickle so .feedcache stays bounded at
+                # one file per source.
+                if metrics.content_hash and metrics.content_hash != new_hash:
+                    try:
+                        os.remove(os.path.join(
+                            FEED_CACHE_DIR,
+                            f"{source_name}_{metrics.content_hash}.pkl",
+                        ))
+                    except OSError:
+                        pass
+                metrics.content_hash = new_hash
+        return source_name, candidates
+
+    def fetch_articles_from_dynamic_sources(self) -> List[Dict]:
+        """Fetch, dedupe, and score articles from the top sources.
+
+        Feed fetches are IO-bound, so they fan out on a thread pool; dedupe
+        and scoring happen afterwards on the calling thread, so cross-posted
+        URLs (hacker_news, techmeme, medium republishing) pay the LLM cost
+        exactly once and the metrics dict stays single-writer.
+        """
+        self.source_manager.ensure_sources()
+        top_sources = self.source_manager.get_top_sources()
+        if not top_sources:
+            return []
+        per_source: Dict[str, List[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=min(10, len(top_sources))) as executor:
+            futures = [
+                executor.submit(self._fetch_source, name, url)
+                for name, url in top_sources.items()
+            ]
+            for future in as_completed(futures):
+                try:
+                    name, candidates = future.result()
+                except Exception as e:
+                    print(f"Source fetch failed: {e}")
+                    continue
+                per_source[name] = candidates
+        # Exact-match dedupe on canonical URL before any scoring.
+        seen: Dict[str, Dict] = {}
+        for name, candidates in per_source.items():
+            for article in candidates:
+                key = canonical_url(article["link"]) or article["title"].lower()
+                if key in seen:
+                    seen[key]["sources"].append(name)
+                else:
+                    article["sources"] = [name]
+                    seen[key] = article
+        unique = list(seen.values())
+        scores = [self._lexical_score(a) for a in unique]
+        if unique and self._embedder() is not None:
+            # Hybrid local scoring: cosine against the reference embedding
+            # blended with the keyword overlap. No network calls at all.
+            cosine = self.score_articles_embed(unique)
+            scores = [
+                0.7 * float(c) + 0.3 * min(l, 1.0)
+                for c, l in zip(cosine, scores)
+            ]
+        else:
+            # LLM fallback, gated by the cheap lexical pre-filter: obvious
+            # noise keeps its lexical score and never pays an API call.
+            to_llm = [i for i, s in enumerate(scores) if s >= 0.02]
+            llm_scores = self.analyze_articles_relevance_batch(
+                [unique[i] for i in to_llm]
+            )
+            for i, score in zip(to_llm, llm_scores):
+                scores[i] = score
+        score_by_key = {}
+        for article, score in zip(unique, scores):
+            article["score"] = score
+            score_by_key[canonical_url(article["link"]) or article["title"].lower()] = score
+        # Per-source metrics come from the deduped scores, so a source still
+        # gets credit for an article another feed carried first.
+        for name, candidates in per_source.items():
+            if not candidates:
+                continue
+            src_scores = [
+                score_by_key.get(canonical_url(c["link"]) or c["title"].lower(), 0.0)
+                for c in candidates
+            ]
+            relevant = sum(1 for s in src_scores if s >= 0.5)
+            self.source_manager.update_metrics(
+                name, len(candidates), relevant, sum(src_scores) / len(src_scores)
+            )
+            print(f"  {name}: {relevant}/{len(candidates)} relevant articles")
+        return [a for a in unique if a["score"] >= 0.5]
+
+    def rank_articles(self, articles: List[Dict], limit: int = 10) -> List[Dict]:
+        """Top articles by (score desc, recency desc) via a vectorized argsort.
+
+        The lexsort runs in C over two flat arrays instead of calling a
+        Python key lambda per comparison, which matters once discovery grows
+        the pool toward max_sources * 10 entries.
+        """
+        if not articles:
+            return []
+        count = len(articles)
+        scores = np.fromiter((a["score"] for a in articles), dtype=np.float32, count=count)
+        published = np.fromiter(
+            (int((a.get("published_dt", EPOCH) - EPOCH).total_seconds()) for a in articles),
+            dtype=np.int64,
+            count=count,
+        )
+        order = np.lexsort((-published, -scores))[:limit]
+        return [articles[i] for i in order]
+
+    def generate_ai_insights(self, articles: List[Dict]) -> str:
+        """Ask OpenAI for a short trends paragraph over the top articles."""
+        key = "insights:" + hashlib.sha1(
+            "\n".join(sorted(a["title"] for a in articles)).encode()
+        ).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        titles = "\n".join(f"- {a['title']}" for a in articles)
+        prompt = (
+            "Given today's top tech articles, write a short paragraph on the "
+            f"key trends:\n{titles}"
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=200,
+                temperature=0.7,
+            )
+            insights = response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Insights generation failed: {e}")
+            return "Insights unavailable today."
+        self._cache_put(key, insights)
+        return insights
+
+    def create_newsletter_content(self, articles: List[Dict]) -> str:
+        today = datetime.now().strftime("%B %d, %Y")
+        lines = [
+            f"# AI & Tech Newsletter - {today}",
+            "",
+            "## Today's Insights",
+            "",
+            self.generate_ai_insights(articles),
+            "",
+            "## Top Stories",
+            "",
+        ]
+        for i, article in enumerate(articles, 1):
+            lines.append(f"### {i}. {article['title']}")
+            lines.append(f"*Source: {article['source']} | Relevance: {article['score']:.2f}*")
+            lines.append("")
+            summary = article["summary"][:300]
+            lines.append(summary)
+            lines.append(f"[Read more]({article['link']})")
+            lines.append("")
+        return "\n".join(lines)
+
+    def generate_newsletter(self) -> str:
+        print("Fetching articles from dynamic sources...")
+        articles = self.fetch_articles_from_dynamic_sources()
+        print(f"Collected {len(articles)} relevant articles")
+        top_articles = self.rank_articles(articles)
+        self.source_manager.auto_optimize_sources()
+        return self.create_newsletter_content(top_articles)
+
+    @functools.lru_cache(maxsize=4)
+    def convert_markdown_to_html(self, markdown_content: str) -> str:
+        # Cached: back-to-back scheduler runs over identical content reuse
+        # the rendered HTML instead of re-running the regex pass.
+        html = _MD_RE.sub(_md_sub, markdown_content).replace("\n\n", "<br><br>")
+        return f"<html><body>{html}</body></html>"
+
+    def send_newsletter_to_subscribers(self, content: str):
+        if not self.subscribers or not self.email_address:
+            print("No subscribers or email credentials configured; skipping send")
+            return
+        html_content = self.convert_markdown_to_html(content)
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = f"AI & Tech Newsletter - {datetime.now().strftime('%B %d, %Y')}"
+        msg["From"] = self.email_address
+        msg["To"] = self.email_address
+        msg.attach(MIMEText(content, "plain"))
+        msg.attach(MIMEText(html_content, "html"))
+        msg_bytes = msg.as_bytes()
+        # One TLS+AUTH handshake for the whole list, and one DATA transfer
+        # per batch: recipients ride the SMTP envelope (effectively BCC), so
+        # the body is uploaded once per 50 subscribers instead of once each.
+        try:
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.email_address, self.email_password)
+                for start in range(0, len(self.subscribers), 50):
+                    batch = self.subscribers[start:start + 50]
+                    try:
+                        server.sendmail(self.email_address, batch, msg_bytes)
+                        print(f"Sent to {len(batch)} subscribers")
+                    except smtplib.SMTPServerDisconnected:
+                        server.connect(self.smtp_server, self.smtp_port)
+                        server.starttls()
+                        server.login(self.email_address, self.email_password)
+                        server.sendmail(self.email_address, batch, msg_bytes)
+                    except Exception as e:
+                        print(f"Failed to send batch: {e}")
+        except Exception as e:
+            print(f"SMTP session failed: {e}")
+
+
+if __name__ == "__main__":
+    generator = EnhancedNewsletterGeneratorWithDynamicSources()
+    newsletter = generator.generate_newsletter()
+    filename = f"dynamic_newsletter_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(newsletter)
+    print(f"Newsletter saved to {filename}")
+    generator.send_newsletter_to_subscribers(newsletter)
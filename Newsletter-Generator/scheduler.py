@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Weekly scheduling and subscriber management for the newsletter."""
+
+import sqlite3
+import threading
+import time
+
+import schedule
+
+
+class NewsletterScheduler:
+    """Runs the generator on a weekly schedule and tracks subscribers."""
+
+    VALID_DAYS = (
+        "monday", "tuesday", "wednesday", "thursday",
+        "friday", "saturday", "sunday",
+    )
+
+    def __init__(self, generator, db_path="newsletters.db"):
+        self.generator = generator
+        # Subscribers persist in the shared SQLite database rather than a
+        # per-process dict: under multi-worker serving a subscribe POST
+        # lands on one worker while the weekly send runs in another, so
+        # the list has to live where every process can see it.
+        self.db_path = db_path
+        conn = self._connect()
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS subscribers (
+                email TEXT PRIMARY KEY,
+                subscribed_at REAL NOT NULL
+            )"""
+        )
+        conn.commit()
+        conn.close()
+        self.schedule_day = "monday"
+        self.schedule_time = "09:00"
+        self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @property
+    def subscribers(self):
+        """Current subscriber emails, read fresh from the shared table."""
+        conn = self._connect()
+        try:
+            return [
+                row[0] for row in conn.execute(
+                    "SELECT email FROM subscribers ORDER BY subscribed_at"
+                )
+            ]
+        finally:
+            conn.close()
+
+    def add_subscriber(self, email: str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO subscribers (email, subscribed_at)"
+                " VALUES (?, ?)",
+                (email, time.time()),
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def remove_subscriber(self, email: str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM subscribers WHERE email = ?", (email,)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def set_schedule(self, day: str, time_str: str) -> bool:
+        """Re-register the weekly job; rejects bad input before touching state.
+
+        Validation comes first so an invalid day or time can never clear the
+        existing job and leave nothing scheduled.
+        """
+        if day not in self.VALID_DAYS:
+            return False
+        try:
+            new_job = getattr(schedule.every(), day).at(time_str).do(
+                self.run_newsletter_job
+            )
+        except schedule.ScheduleValueError:
+            return False
+        for job in [j for j in schedule.jobs if j is not new_job]:
+            schedule.cancel_job(job)
+        self.schedule_day = day
+        self.schedule_time = time_str
+        return True
+
+    def _register_job(self):
+        getattr(schedule.every(), self.schedule_day).at(self.schedule_time).do(
+            self.run_newsletter_job
+        )
+
+    def run_newsletter_job(self):
+        print("Running scheduled newsletter job...")
+        content = self.generator.generate_newsletter()
+        self.generator.subscribers = list(self.subscribers)
+        self.generator.send_newsletter_to_subscribers(content)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._register_job()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            schedule.run_pending()
+            time.sleep(30)